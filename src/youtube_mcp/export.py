@@ -0,0 +1,342 @@
+"""Bulk offline export of YouTube captions to JSONL or Parquet shards."""
+
+import argparse
+import json
+import logging
+import os
+import re
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from typing import Any
+
+from dotenv import load_dotenv
+
+from .utils import extract_video_id, is_valid_youtube_url
+from .youtube_client import CAPTION_FIELDS, YouTubeClient
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "checkpoint.txt"
+SHARD_PATTERN = re.compile(r"^part-(\d+)\.(?:jsonl|parquet)$")
+
+
+class ShardWriter:
+    """Write caption records to size-bounded shards with a per-record checkpoint.
+
+    Records are appended to a JSONL spool file (``<shard>.tmp``) that becomes the
+    shard, converted to Parquet if requested, once it is full. Each record is
+    flushed to the spool before its ``(shard, video_id, language)`` line is
+    flushed to the checkpoint, so every checkpointed record is on disk. On resume,
+    checkpointed records left in a spool by a crash are recovered into a finished
+    shard and anything else in it is discarded, so no completed video is fetched
+    twice and no record is duplicated.
+    """
+
+    def __init__(self, output_dir: str, output_format: str = "jsonl", shard_size: int = 1000):
+        """Initialize writer, resuming shard numbering and checkpoint from ``output_dir``."""
+        if output_format not in ("jsonl", "parquet"):
+            raise ValueError(f"Unsupported output format: {output_format}")
+        if shard_size < 1:
+            raise ValueError("shard_size must be at least 1")
+
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.shard_size = shard_size
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._next_shard = self._next_shard_index()
+        self.completed = self._load_checkpoint()
+        self._shard_count = 0
+        self._file = None
+        self._checkpoint = None
+
+    def write(self, record: dict[str, Any], language: str) -> None:
+        """Append a record fetched for ``language`` to the open shard, rotating when full."""
+        path = self._shard_path()
+        if self._file is None:
+            self._file = open(path + ".tmp", "w", encoding="utf-8")
+            self._checkpoint = open(
+                os.path.join(self.output_dir, CHECKPOINT_FILE),
+                "a",
+                encoding="utf-8",
+            )
+
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._checkpoint.write(f"{os.path.basename(path)}\t{record['video_id']}\t{language}\n")
+        self._checkpoint.flush()
+
+        self.completed.add((record["video_id"], language))
+        self._shard_count += 1
+        if self._shard_count >= self.shard_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Finalize the open shard."""
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._checkpoint.close()
+        self._file = self._checkpoint = None
+
+        path = self._shard_path()
+        self._finalize(path)
+        logger.info(f"Wrote {self._shard_count} records to {path}")
+        self._shard_count = 0
+        self._next_shard += 1
+
+    def _shard_path(self) -> str:
+        """Path of the currently open shard."""
+        return os.path.join(self.output_dir, f"part-{self._next_shard:05d}.{self.output_format}")
+
+    def _finalize(self, path: str) -> None:
+        """Turn the JSONL spool for ``path`` into the finished shard."""
+        spool = path + ".tmp"
+        if self.output_format == "jsonl":
+            os.replace(spool, path)
+            return
+
+        with open(spool, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self._write_parquet(path + ".part", records)
+        os.replace(path + ".part", path)
+        os.remove(spool)
+
+    def _load_checkpoint(self) -> set[tuple[str, str]]:
+        """Read exported ``(video_id, language)`` pairs, recovering crashed shards."""
+        path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        if not os.path.exists(path):
+            return set()
+
+        entries: dict[str, set[tuple[str, str]]] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 3:
+                    continue
+                shard_name, video_id, language = parts
+                entries.setdefault(shard_name, set()).add((video_id, language))
+                # Never reuse the number of a shard named in the checkpoint
+                if match := SHARD_PATTERN.match(shard_name):
+                    self._next_shard = max(self._next_shard, int(match.group(1)) + 1)
+
+        completed = set()
+        for shard_name, shard_entries in entries.items():
+            shard_path = os.path.join(self.output_dir, shard_name)
+            spool = shard_path + ".tmp"
+            if os.path.exists(shard_path):
+                completed |= shard_entries
+                if os.path.exists(spool):
+                    os.remove(spool)
+            elif os.path.exists(spool):
+                completed |= self._recover(shard_path, shard_entries)
+        return completed
+
+    def _recover(self, path: str, entries: set[tuple[str, str]]) -> set[tuple[str, str]]:
+        """Finalize a crashed shard, keeping only records that were checkpointed."""
+        spool = path + ".tmp"
+        video_ids = {video_id for video_id, _ in entries}
+        kept = []
+        with open(spool, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A record cut off mid-write was never checkpointed
+                    continue
+                if record.get("video_id") in video_ids:
+                    kept.append(line if line.endswith("\n") else line + "\n")
+
+        with open(spool + ".recovered", "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(spool + ".recovered", spool)
+        self._finalize(path)
+
+        logger.info(f"Recovered {len(kept)} records from interrupted shard {path}")
+        recovered_ids = {json.loads(line)["video_id"] for line in kept}
+        return {entry for entry in entries if entry[0] in recovered_ids}
+
+    def _next_shard_index(self) -> int:
+        """Continue numbering after the highest existing shard."""
+        indices = [
+            int(match.group(1))
+            for name in os.listdir(self.output_dir)
+            if (match := SHARD_PATTERN.match(name))
+        ]
+        return max(indices, default=-1) + 1
+
+    @staticmethod
+    def _write_parquet(path: str, records: list[dict[str, Any]]) -> None:
+        """Write records to a Parquet file (requires pyarrow)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError(
+                "Parquet export requires pyarrow. Install with: uv sync --extra export",
+            ) from e
+
+        schema = pa.schema(
+            [
+                ("video_id", pa.string()),
+                ("video_title", pa.string()),
+                ("captions", pa.string()),
+                ("language_used", pa.string()),
+                ("available_languages", pa.list_(pa.string())),
+                ("caption_type", pa.string()),
+                ("message", pa.string()),
+            ],
+        )
+        pq.write_table(pa.Table.from_pylist(records, schema=schema), path)
+
+
+def iter_video_ids(client: YouTubeClient, urls: Iterable[str]) -> Iterator[str]:
+    """Yield unique video IDs from video and playlist URLs, expanding playlists."""
+    seen = set()
+    for url in urls:
+        if not is_valid_youtube_url(url):
+            logger.warning(f"Skipping invalid YouTube URL: {url}")
+            continue
+
+        if "list=" in url:
+            result = client.get_playlist_titles(url, fields=["video_id"], compact=True)
+            if "error" in result:
+                logger.error(f"Failed to list playlist {url}: {result['error']}")
+                continue
+            video_ids = [row[0] for row in result["videos"]]
+        else:
+            video_id = extract_video_id(url)
+            video_ids = [video_id] if video_id else []
+
+        for video_id in video_ids:
+            if video_id not in seen:
+                seen.add(video_id)
+                yield video_id
+
+
+def export_captions(
+    client: YouTubeClient,
+    urls: Iterable[str],
+    writer: ShardWriter,
+    language: str = "en",
+    workers: int = 4,
+) -> tuple[int, int]:
+    """Fetch captions with bounded parallelism and stream them to ``writer``.
+
+    At most ``2 * workers`` fetches are in flight at once, so memory does not grow
+    with the size of the corpus. Returns the number of exported and failed videos.
+    """
+    exported = failed = 0
+    max_in_flight = workers * 2
+
+    def handle(future: Future, video_id: str) -> None:
+        nonlocal exported, failed
+        try:
+            result = future.result()
+        except Exception:
+            logger.exception(f"Caption extraction raised for {video_id}")
+            failed += 1
+            return
+
+        if "error" in result:
+            logger.error(f"Caption extraction failed for {video_id}: {result['error']}")
+            failed += 1
+            return
+
+        # Captions listed but not downloaded is a failure worth retrying, unlike a
+        # video that has no captions at all
+        if result.get("captions") is None and result.get("available_languages"):
+            logger.error(f"Caption download failed for {video_id}: {result.get('message')}")
+            failed += 1
+            return
+
+        writer.write(
+            {field: result.get(field) for field in (*CAPTION_FIELDS, "message")},
+            language,
+        )
+        exported += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="caption-export") as pool:
+            in_flight: dict[Future, str] = {}
+            for video_id in iter_video_ids(client, urls):
+                if (video_id, language) in writer.completed:
+                    continue
+
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        handle(future, in_flight.pop(future))
+
+                url = f"https://www.youtube.com/watch?v={video_id}"
+                in_flight[pool.submit(client.get_video_captions, url, language)] = video_id
+
+            for future in as_completed(list(in_flight)):
+                handle(future, in_flight.pop(future))
+    finally:
+        # Finalize the open shard even on Ctrl-C so it does not wait for recovery
+        writer.flush()
+    return exported, failed
+
+
+def read_urls(urls: list[str], input_file: str | None) -> Iterator[str]:
+    """Yield URLs from the command line followed by those in ``input_file``."""
+    yield from urls
+    if input_file:
+        with open(input_file, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for the caption export CLI."""
+    parser = argparse.ArgumentParser(
+        prog="youtube-mcp-export",
+        description="Export captions for YouTube videos and playlists to JSONL or Parquet shards.",
+    )
+    parser.add_argument("urls", nargs="*", help="YouTube video or playlist URLs")
+    parser.add_argument("-i", "--input", help="File with one URL per line")
+    parser.add_argument("-o", "--output", required=True, help="Output directory for shards")
+    parser.add_argument("-f", "--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("-l", "--language", default="en", help="Preferred caption language")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Parallel extractions")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Records per shard")
+    args = parser.parse_args(argv)
+
+    if not args.urls and not args.input:
+        parser.error("provide at least one URL or --input file")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    try:
+        client = YouTubeClient()
+        writer = ShardWriter(args.output, args.format, args.shard_size)
+        if writer.completed:
+            logger.info(f"Resuming: {len(writer.completed)} exports already completed")
+
+        exported, failed = export_captions(
+            client,
+            read_urls(args.urls, args.input),
+            writer,
+            language=args.language,
+            workers=args.workers,
+        )
+    except Exception as e:
+        logger.error(f"Export failed: {e}")
+        return 1
+
+    logger.info(f"Export finished: {exported} exported, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
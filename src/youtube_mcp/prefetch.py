@@ -0,0 +1,151 @@
+"""Speculative background prefetch of video captions."""
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class CaptionPrefetcher:
+    """Warm caption results for videos an agent is likely to request next.
+
+    Prefetches run on a small dedicated worker pool so they never compete with
+    foreground tool calls for more than ``max_concurrency`` threads. At most
+    ``budget`` prefetches may be in flight or waiting to be consumed at once,
+    which bounds the extraction work spent on guesses. Entries that are not
+    claimed within ``ttl_seconds`` are cancelled (if not yet started) and dropped.
+    Workers are daemon threads, so a prefetch stuck in yt-dlp never blocks exit.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str], dict[str, Any]],
+        top_n: int = 3,
+        max_concurrency: int = 2,
+        budget: int = 10,
+        ttl_seconds: float = 300.0,
+        language: str = "en",
+    ):
+        """Initialize prefetcher with a ``fetch(video_url, language)`` callable."""
+        if top_n < 0 or budget < 0:
+            raise ValueError("top_n and budget must be non-negative")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+
+        self.fetch = fetch
+        self.top_n = top_n
+        self.budget = budget
+        self.ttl_seconds = ttl_seconds
+        self.language = language
+
+        self._lock = threading.Lock()
+        # (video_id, language) -> (future, expiry timestamp)
+        self._entries: dict[tuple[str, str], tuple[Future, float]] = {}
+        self._queue: queue.SimpleQueue[tuple[Future, str, float] | None] = queue.SimpleQueue()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"caption-prefetch-{i}", daemon=True)
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def schedule(self, video_ids: Iterable[str]) -> list[str]:
+        """Queue captions for the first ``top_n`` videos; return the IDs scheduled."""
+        scheduled = []
+        with self._lock:
+            self._evict_expired()
+            for video_id in list(video_ids)[: self.top_n]:
+                key = (video_id, self.language)
+                if key in self._entries:
+                    continue
+                if len(self._entries) >= self.budget:
+                    logger.debug("Prefetch budget exhausted, skipping remaining videos")
+                    break
+
+                expires_at = time.monotonic() + self.ttl_seconds
+                future = Future()
+                self._queue.put((future, video_id, expires_at))
+                self._entries[key] = (future, expires_at)
+                scheduled.append(video_id)
+
+        if scheduled:
+            logger.info(f"Prefetching captions for {len(scheduled)} videos: {scheduled}")
+        return scheduled
+
+    def take(self, video_id: str, language: str) -> dict[str, Any] | None:
+        """Claim a prefetched result, waiting if it is already being fetched.
+
+        Returns None when nothing usable was prefetched; the caller should then
+        fetch in the foreground. A prefetch that is still queued is cancelled so
+        the caller does not wait behind other speculative work, and a running one
+        is waited on for at most what remains of its TTL.
+        """
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.pop((video_id, language), None)
+
+        if entry is None:
+            return None
+
+        future, expires_at = entry
+        if future.cancel():
+            logger.debug(f"Cancelled queued prefetch for {video_id}, fetching directly")
+            return None
+
+        try:
+            result = future.result(timeout=max(expires_at - time.monotonic(), 0))
+        except TimeoutError:
+            future.cancel()
+            logger.warning(f"Prefetch for {video_id} still running at TTL, fetching directly")
+            return None
+        except Exception:
+            logger.exception(f"Prefetch for {video_id} raised")
+            return None
+
+        if result is None or "error" in result:
+            return None
+
+        logger.info(f"Serving prefetched captions for video: {video_id}")
+        return result
+
+    def shutdown(self) -> None:
+        """Cancel pending prefetches and stop the workers without waiting for them."""
+        with self._lock:
+            for future, _ in self._entries.values():
+                future.cancel()
+            self._entries.clear()
+        for _ in self._workers:
+            self._queue.put(None)
+
+    def _work(self) -> None:
+        """Worker loop: run queued prefetches until a shutdown sentinel arrives."""
+        while (item := self._queue.get()) is not None:
+            future, video_id, expires_at = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            # Skip entries that expired while waiting in the queue
+            if time.monotonic() >= expires_at:
+                future.set_result(None)
+                continue
+            try:
+                url = f"https://www.youtube.com/watch?v={video_id}"
+                future.set_result(self.fetch(url, self.language))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _evict_expired(self) -> None:
+        """Drop entries that were never claimed; caller must hold the lock."""
+        now = time.monotonic()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            future, _ = self._entries.pop(key)
+            future.cancel()
+        if expired:
+            logger.debug(f"Dropped {len(expired)} unused prefetch entries")
@@ -0,0 +1,178 @@
+"""Deadlines, retries and hedged attempts for slow extraction phases."""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from http.client import IncompleteRead
+from typing import Any
+
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseTimeoutError(TimeoutError):
+    """Raised when an extraction phase does not finish before its deadline."""
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Check whether an error (or its underlying cause) is worth retrying.
+
+    yt-dlp wraps network failures in DownloadError, keeping the original in
+    ``exc_info``, so the cause chain is walked as well.
+    """
+    seen = set()
+    current: BaseException | None = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+
+        if isinstance(current, HTTPError):
+            return current.status == 429 or current.status >= 500
+        if isinstance(current, TimeoutError | ConnectionError | TransportError | IncompleteRead):
+            return True
+
+        exc_info = getattr(current, "exc_info", None)
+        wrapped = exc_info[1] if isinstance(exc_info, tuple) and len(exc_info) > 1 else None
+        current = wrapped or current.__cause__ or current.__context__
+
+    return False
+
+
+class LatencyTracker:
+    """Rolling window of successful phase durations."""
+
+    def __init__(self, window: int = 100, min_samples: int = 20):
+        """Initialize tracker keeping the last ``window`` samples."""
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Record a successful phase duration."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the given latency percentile, or None until enough samples exist."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class PhaseRunner:
+    """Run one extraction phase with a deadline, transient-error retries and hedging.
+
+    The deadline covers every attempt and backoff, so a phase never holds its
+    caller longer than ``timeout``; hitting it is not retried. Each attempt starts
+    immediately on its own daemon thread, so no time is lost queueing behind other
+    callers and the caller can stop waiting even if yt-dlp is stuck; an abandoned
+    attempt ends at yt-dlp's socket timeout and never blocks interpreter exit.
+    With hedging enabled, a second attempt is started once the first exceeds the
+    observed p95 latency and whichever finishes first wins. Without a timeout or
+    hedging, attempts run directly on the calling thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float | None = 30.0,
+        max_retries: int = 2,
+        backoff: float = 1.0,
+        *,
+        hedge: bool = False,
+        tracker: LatencyTracker | None = None,
+    ):
+        """Initialize runner for the phase called ``name``."""
+        if max_retries < 0:
+            raise ValueError("max_retries must be non-negative")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive")
+
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.hedge = hedge
+        self.tracker = tracker or LatencyTracker()
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call ``fn(*args)``, retrying transient failures with exponential backoff."""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        attempt = 0
+        while True:
+            try:
+                return self._run_once(fn, args, deadline)
+            except PhaseTimeoutError:
+                raise
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    raise
+                delay = self.backoff * 2**attempt
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                attempt += 1
+                logger.warning(
+                    f"{self.name} failed with transient error ({e}), "
+                    f"retrying in {delay:.1f}s ({attempt}/{self.max_retries})",
+                )
+                time.sleep(delay)
+
+    def _run_once(self, fn: Callable[..., Any], args: tuple, deadline: float | None) -> Any:
+        """Run a single (possibly hedged) attempt, giving up at ``deadline``."""
+        start = time.monotonic()
+        if deadline is None and not self.hedge:
+            result = fn(*args)
+            self.tracker.record(time.monotonic() - start)
+            return result
+
+        hedge_after = self.tracker.percentile(0.95) if self.hedge else None
+        pending: set[Future] = {self._start_attempt(fn, args)}
+        hedged = hedge_after is None or (deadline is not None and start + hedge_after >= deadline)
+        last_error: BaseException | None = None
+
+        while pending:
+            wait_until = deadline
+            if not hedged:
+                hedge_at = start + hedge_after
+                wait_until = hedge_at if deadline is None else min(hedge_at, deadline)
+            remaining = None if wait_until is None else max(wait_until - time.monotonic(), 0)
+
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    self.tracker.record(time.monotonic() - start)
+                    return future.result()
+                last_error = error
+
+            if done:
+                continue
+            if not hedged:
+                logger.info(f"{self.name} exceeded p95 ({hedge_after:.1f}s), hedging")
+                pending.add(self._start_attempt(fn, args))
+                hedged = True
+                continue
+
+            raise PhaseTimeoutError(f"{self.name} timed out after {self.timeout:g}s")
+
+        raise last_error
+
+    def _start_attempt(self, fn: Callable[..., Any], args: tuple) -> Future:
+        """Start ``fn(*args)`` on a new daemon thread and return its future."""
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+
+        def attempt() -> None:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=attempt, name=self.name, daemon=True).start()
+        return future
@@ -7,8 +7,9 @@ from typing import Any
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 
-from .utils import is_valid_youtube_url
-from .youtube_client import YouTubeClient
+from .prefetch import CaptionPrefetcher
+from .utils import extract_video_id, is_valid_youtube_url, project_fields, resolve_fields
+from .youtube_client import CAPTION_FIELDS, COMPACT_CAPTION_FIELDS, YouTubeClient
 
 # Load environment variables
 load_dotenv()
@@ -32,6 +33,10 @@ mcp = FastMCP("YouTube MCP")
 # Initialize YouTube client
 youtube_client = None
 
+# Initialize caption prefetcher (opt-in via YOUTUBE_PREFETCH)
+caption_prefetcher = None
+caption_prefetcher_configured = False
+
 
 def get_youtube_client() -> YouTubeClient:
     """Get or create YouTube client instance."""
@@ -47,13 +52,50 @@ def get_youtube_client() -> YouTubeClient:
     return youtube_client
 
 
+def get_caption_prefetcher() -> CaptionPrefetcher | None:
+    """Get or create the caption prefetcher, or None if prefetching is disabled."""
+    global caption_prefetcher, caption_prefetcher_configured
+    if caption_prefetcher_configured:
+        return caption_prefetcher
+
+    # Configure once; prefetch is optional, so bad settings disable it instead of failing tools
+    caption_prefetcher_configured = True
+    if os.getenv("YOUTUBE_PREFETCH", "").lower() not in ("true", "1", "yes"):
+        return None
+
+    try:
+        client = get_youtube_client()
+        caption_prefetcher = CaptionPrefetcher(
+            client.get_video_captions,
+            top_n=int(os.getenv("YOUTUBE_PREFETCH_TOP_N", "3")),
+            max_concurrency=int(os.getenv("YOUTUBE_PREFETCH_CONCURRENCY", "2")),
+            budget=int(os.getenv("YOUTUBE_PREFETCH_BUDGET", "10")),
+            ttl_seconds=float(os.getenv("YOUTUBE_PREFETCH_TTL", "300")),
+            language=os.getenv("YOUTUBE_PREFETCH_LANGUAGE", "en"),
+        )
+        logger.info("Caption prefetcher initialized")
+    except Exception:
+        logger.exception("Invalid caption prefetch configuration, prefetching disabled")
+        caption_prefetcher = None
+    return caption_prefetcher
+
+
 @mcp.tool()
-def extract_youtube_captions(video_url: str, language_preference: str = "en") -> dict[str, Any]:
+def extract_youtube_captions(
+    video_url: str,
+    language_preference: str = "en",
+    *,
+    fields: list[str] | None = None,
+    compact: bool = False,
+) -> dict[str, Any]:
     """Extract captions/subtitles from a YouTube video.
 
     Args:
         video_url: YouTube video URL (e.g., https://www.youtube.com/watch?v=VIDEO_ID)
         language_preference: Preferred language code (e.g., 'en', 'es', 'fr'). Defaults to 'en'.
+        fields: Response fields to include (video_id, video_title, captions, language_used,
+            available_languages, caption_type). Captions are not downloaded unless requested.
+        compact: Return only video_id, captions and language_used when fields is not given.
 
     Returns:
         Dictionary containing video information and captions data.
@@ -70,9 +112,29 @@ def extract_youtube_captions(video_url: str, language_preference: str = "en") ->
                 "message": "Please provide a valid YouTube video URL",
             }
 
-        client = get_youtube_client()
-        logger.debug(f"Extracting captions for video: {video_url}")
-        result = client.get_video_captions(video_url, language_preference)
+        result = None
+        prefetcher = get_caption_prefetcher()
+        video_id = extract_video_id(video_url)
+        if prefetcher is not None and video_id:
+            result = prefetcher.take(video_id, language_preference)
+
+        if result is not None:
+            selected = resolve_fields(
+                fields,
+                CAPTION_FIELDS,
+                COMPACT_CAPTION_FIELDS,
+                compact=compact,
+            )
+            result = project_fields(result, selected)
+        else:
+            client = get_youtube_client()
+            logger.debug(f"Extracting captions for video: {video_url}")
+            result = client.get_video_captions(
+                video_url,
+                language_preference,
+                fields=fields,
+                compact=compact,
+            )
 
         if "error" in result:
             logger.error(f"Caption extraction failed: {result.get('error', 'Unknown error')}")
@@ -88,11 +150,19 @@ def extract_youtube_captions(video_url: str, language_preference: str = "en") ->
 
 
 @mcp.tool()
-def extract_video_topics(video_url: str) -> dict[str, Any]:
+def extract_video_topics(
+    video_url: str,
+    *,
+    fields: list[str] | None = None,
+    compact: bool = False,
+) -> dict[str, Any]:
     """Extract topics and sections from a YouTube video description.
 
     Args:
         video_url: YouTube video URL (e.g., https://www.youtube.com/watch?v=VIDEO_ID)
+        fields: Response fields to include (video_id, video_title, channel_title, description,
+            topics, tags, category_id, published_at). Only these are fetched from the API.
+        compact: Return only video_id, video_title and topics when fields is not given.
 
     Returns:
         Dictionary containing video information and extracted topics/sections.
@@ -109,7 +179,7 @@ def extract_video_topics(video_url: str) -> dict[str, Any]:
 
         client = get_youtube_client()
         logger.debug(f"Extracting topics for video: {video_url}")
-        result = client.get_video_topics(video_url)
+        result = client.get_video_topics(video_url, fields=fields, compact=compact)
 
         if "error" in result:
             logger.error(f"Topic extraction failed: {result.get('error', 'Unknown error')}")
@@ -126,11 +196,20 @@ def extract_video_topics(video_url: str) -> dict[str, Any]:
 
 
 @mcp.tool()
-def extract_playlist_titles(playlist_url: str) -> dict[str, Any]:
+def extract_playlist_titles(
+    playlist_url: str,
+    *,
+    fields: list[str] | None = None,
+    compact: bool = False,
+) -> dict[str, Any]:
     """Extract video titles from a YouTube playlist.
 
     Args:
         playlist_url: YouTube playlist URL (e.g., https://www.youtube.com/playlist?list=PLAYLIST_ID)
+        fields: Per-video fields to include (video_id, title, channel_title, published_at,
+            position). Only these are fetched from the API.
+        compact: Return each video as a row ordered by the `video_fields` header, defaulting
+            to video_id, title and position, and only the playlist title.
 
     Returns:
         Dictionary containing playlist information and video titles.
@@ -154,7 +233,7 @@ def extract_playlist_titles(playlist_url: str) -> dict[str, Any]:
 
         client = get_youtube_client()
         logger.debug(f"Extracting playlist titles for: {playlist_url}")
-        result = client.get_playlist_titles(playlist_url)
+        result = client.get_playlist_titles(playlist_url, fields=fields, compact=compact)
 
         if "error" in result:
             logger.error(f"Playlist extraction failed: {result.get('error', 'Unknown error')}")
@@ -165,6 +244,13 @@ def extract_playlist_titles(playlist_url: str) -> dict[str, Any]:
                 f"Successfully extracted {video_count} videos from playlist: {playlist_title}",
             )
 
+            prefetcher = get_caption_prefetcher()
+            if prefetcher is not None:
+                try:
+                    prefetcher.schedule(_playlist_video_ids(result))
+                except Exception:
+                    logger.exception("Failed to schedule caption prefetch")
+
         return result
 
     except Exception as e:
@@ -172,6 +258,17 @@ def extract_playlist_titles(playlist_url: str) -> dict[str, Any]:
         return {"error": str(e), "message": "Failed to extract titles from YouTube playlist"}
 
 
+def _playlist_video_ids(result: dict[str, Any]) -> list[str]:
+    """Collect video IDs from a playlist result in either dict or compact row form."""
+    videos = result.get("videos", [])
+    if "video_fields" in result:
+        if "video_id" not in result["video_fields"]:
+            return []
+        index = result["video_fields"].index("video_id")
+        return [row[index] for row in videos]
+    return [video["video_id"] for video in videos if "video_id" in video]
+
+
 def main():
     """Main entry point for the MCP server."""
     logger.info("YouTube MCP Server main() called")
@@ -198,7 +295,11 @@ def main():
 
         # Run the FastMCP server
         logger.info("Starting FastMCP server with stdio transport")
-        mcp.run(transport="stdio")
+        try:
+            mcp.run(transport="stdio")
+        finally:
+            if caption_prefetcher is not None:
+                caption_prefetcher.shutdown()
         logger.info("FastMCP server started successfully")
 
     except Exception as e:
@@ -1,6 +1,7 @@
 """Utility functions for YouTube MCP server."""
 
 import re
+from typing import Any
 from urllib.parse import parse_qs, urlparse
 
 
@@ -69,3 +70,31 @@ def clean_caption_text(text: str) -> str:
     text = re.sub(r"\s+", " ", text).strip()
 
     return text
+
+
+def resolve_fields(
+    fields: list[str] | None,
+    available: tuple[str, ...],
+    compact_fields: tuple[str, ...],
+    *,
+    compact: bool = False,
+) -> tuple[str, ...]:
+    """Resolve requested output fields, falling back to the compact or full set."""
+    if fields is None:
+        return compact_fields if compact else available
+
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(available)}",
+        )
+
+    # Preserve the canonical order so compact rows line up with their header
+    return tuple(field for field in available if field in fields)
+
+
+def project_fields(data: dict[str, Any], fields: tuple[str, ...]) -> dict[str, Any]:
+    """Keep only the selected keys, always retaining error details."""
+    return {
+        key: value for key, value in data.items() if key in fields or key in ("error", "message")
+    }
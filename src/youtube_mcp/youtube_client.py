@@ -10,14 +10,88 @@ import yt_dlp
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-from .utils import clean_caption_text, extract_playlist_id, extract_video_id
+from .resilience import PhaseRunner, is_transient_error
+from .utils import (
+    clean_caption_text,
+    extract_playlist_id,
+    extract_video_id,
+    project_fields,
+    resolve_fields,
+)
+
+# Share of the shortest phase deadline allowed for a single yt-dlp socket operation
+SOCKET_TIMEOUT_FRACTION = 0.25
+
+# Output fields per tool, and the subsets returned in compact mode
+CAPTION_FIELDS = (
+    "video_id",
+    "video_title",
+    "captions",
+    "language_used",
+    "available_languages",
+    "caption_type",
+)
+COMPACT_CAPTION_FIELDS = ("video_id", "captions", "language_used")
+
+TOPIC_FIELDS = (
+    "video_id",
+    "video_title",
+    "channel_title",
+    "description",
+    "topics",
+    "tags",
+    "category_id",
+    "published_at",
+)
+COMPACT_TOPIC_FIELDS = ("video_id", "video_title", "topics")
+
+PLAYLIST_VIDEO_FIELDS = ("video_id", "title", "channel_title", "published_at", "position")
+COMPACT_PLAYLIST_VIDEO_FIELDS = ("video_id", "title", "position")
+
+# Data API snippet properties backing each output field, used for `fields=` partial responses
+_TOPIC_SNIPPET_PROPERTIES = {
+    "video_title": "title",
+    "channel_title": "channelTitle",
+    "description": "description",
+    "topics": "description",
+    "tags": "tags",
+    "category_id": "categoryId",
+    "published_at": "publishedAt",
+}
+_PLAYLIST_VIDEO_SNIPPET_PROPERTIES = {
+    "video_id": "resourceId/videoId",
+    "title": "title",
+    "channel_title": "channelTitle",
+    "published_at": "publishedAt",
+    "position": "position",
+}
+
+
+def _snippet_fields(properties: set[str], prefix: str = "") -> str:
+    """Build a Data API `fields` selector for the given snippet properties."""
+    if not properties:
+        return f"{prefix}items(id)"
+    return f"{prefix}items(snippet({','.join(sorted(properties))}))"
 
 
 class YouTubeClient:
     """Client for interacting with YouTube API and yt-dlp."""
 
-    def __init__(self, api_key: str | None = None):
-        """Initialize YouTube client with API key."""
+    def __init__(
+        self,
+        api_key: str | None = None,
+        *,
+        info_timeout: float | None = None,
+        download_timeout: float | None = None,
+        max_retries: int | None = None,
+        hedge: bool | None = None,
+    ):
+        """Initialize YouTube client with API key and caption extraction policy.
+
+        Caption settings default to the YOUTUBE_INFO_TIMEOUT, YOUTUBE_DOWNLOAD_TIMEOUT,
+        YOUTUBE_CAPTION_RETRIES and YOUTUBE_CAPTION_HEDGE environment variables.
+        A timeout of 0 disables that phase's deadline.
+        """
         self.api_key = api_key or os.getenv("YOUTUBE_API_KEY")
         if not self.api_key:
             raise ValueError(
@@ -26,18 +100,51 @@ class YouTubeClient:
 
         self.youtube = build("youtube", "v3", developerKey=self.api_key, cache_discovery=False)
 
+        if info_timeout is None:
+            info_timeout = float(os.getenv("YOUTUBE_INFO_TIMEOUT", "30"))
+        if download_timeout is None:
+            download_timeout = float(os.getenv("YOUTUBE_DOWNLOAD_TIMEOUT", "30"))
+        if max_retries is None:
+            max_retries = int(os.getenv("YOUTUBE_CAPTION_RETRIES", "2"))
+        if hedge is None:
+            hedge = os.getenv("YOUTUBE_CAPTION_HEDGE", "").lower() in ("true", "1", "yes")
+
+        self.info_runner = PhaseRunner(
+            "caption-info",
+            timeout=info_timeout or None,
+            max_retries=max_retries,
+            hedge=hedge,
+        )
+        self.download_runner = PhaseRunner(
+            "caption-download",
+            timeout=download_timeout or None,
+            max_retries=max_retries,
+            hedge=hedge,
+        )
+
     def get_video_captions(
         self,
         video_url: str,
         language_preference: str | None = None,
+        *,
+        fields: list[str] | None = None,
+        compact: bool = False,
     ) -> dict[str, Any]:
         """Extract captions from YouTube video using yt-dlp."""
         video_id = extract_video_id(video_url)
         if not video_id:
             raise ValueError(f"Invalid YouTube URL: {video_url}")
 
-        # Use temporary directory for subtitle files
-        with tempfile.TemporaryDirectory() as temp_dir:
+        selected = resolve_fields(
+            fields,
+            CAPTION_FIELDS,
+            COMPACT_CAPTION_FIELDS,
+            compact=compact,
+        )
+
+        # Use temporary directory for subtitle files; abandoned hedge attempts may still
+        # be writing into it when we return
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
             # Configure yt-dlp to write subtitle files
             ydl_opts = {
                 "writesubtitles": True,
@@ -52,98 +159,171 @@ class YouTubeClient:
                 "outtmpl": os.path.join(temp_dir, "%(title)s.%(ext)s"),
                 "subtitleslangs": [language_preference or "en"] if language_preference else ["en"],
             }
+            # Bound each socket operation well inside the phase deadline so attempts
+            # abandoned at that deadline end soon after
+            phase_timeout = min(
+                (t for t in (self.info_runner.timeout, self.download_runner.timeout) if t),
+                default=None,
+            )
+            if phase_timeout:
+                ydl_opts["socket_timeout"] = phase_timeout * SOCKET_TIMEOUT_FRACTION
+            # Retries are owned by the phase runners; yt-dlp's own would multiply them
+            ydl_opts["retries"] = 0
+            ydl_opts["extractor_retries"] = 0
 
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    # Extract info to get available languages
-                    info = ydl.extract_info(
-                        f"https://www.youtube.com/watch?v={video_id}",
-                        download=False,
-                    )
+                # Extract info to get available languages
+                info = self.info_runner.run(self._extract_caption_info, video_id, ydl_opts)
 
-                    subtitles = info.get("subtitles", {})
-                    automatic_captions = info.get("automatic_captions", {})
-                    all_captions = {**subtitles, **automatic_captions}
+                subtitles = info.get("subtitles", {})
+                automatic_captions = info.get("automatic_captions", {})
+                all_captions = {**subtitles, **automatic_captions}
 
-                    if not all_captions:
-                        return {
+                if not all_captions:
+                    return project_fields(
+                        {
                             "video_id": video_id,
                             "video_title": info.get("title", "Unknown"),
                             "captions": None,
                             "available_languages": [],
                             "message": "No captions available for this video",
-                        }
-
-                    # Determine best language
-                    target_lang = language_preference or "en"
-                    if target_lang in all_captions:
-                        chosen_lang = target_lang
-                    elif any(lang.startswith(target_lang) for lang in all_captions):
-                        chosen_lang = next(
-                            lang for lang in all_captions if lang.startswith(target_lang)
-                        )
-                    else:
-                        chosen_lang = list(all_captions.keys())[0]
+                        },
+                        selected,
+                    )
 
-                    # Configure for specific language and download subtitles
-                    ydl_opts_download = {
-                        **ydl_opts,
-                        "subtitleslangs": [chosen_lang],
-                    }
+                # Determine best language
+                target_lang = language_preference or "en"
+                if target_lang in all_captions:
+                    chosen_lang = target_lang
+                elif any(lang.startswith(target_lang) for lang in all_captions):
+                    chosen_lang = next(
+                        lang for lang in all_captions if lang.startswith(target_lang)
+                    )
+                else:
+                    chosen_lang = list(all_captions.keys())[0]
 
-                    with yt_dlp.YoutubeDL(ydl_opts_download) as ydl_download:
-                        ydl_download.download([f"https://www.youtube.com/watch?v={video_id}"])
+                caption_info = {
+                    "video_id": video_id,
+                    "video_title": info.get("title", "Unknown"),
+                    "language_used": chosen_lang,
+                    "available_languages": list(all_captions.keys()),
+                    "caption_type": (
+                        "automatic" if chosen_lang in automatic_captions else "manual"
+                    ),
+                }
 
-                    # Find and read the subtitle file
-                    subtitle_files = glob.glob(os.path.join(temp_dir, f"*.{chosen_lang}.srt"))
-                    if not subtitle_files:
-                        # Try without country code
-                        lang_base = chosen_lang.split("-")[0]
-                        subtitle_files = glob.glob(os.path.join(temp_dir, f"*.{lang_base}.srt"))
+                # Skip the subtitle download entirely when the text was not requested
+                if "captions" not in selected:
+                    return project_fields(caption_info, selected)
 
-                    if subtitle_files:
-                        with open(subtitle_files[0], encoding="utf-8") as f:
-                            caption_text = f.read()
-                            cleaned_text = clean_caption_text(caption_text)
+                cleaned_text = self.download_runner.run(
+                    self._download_caption_text,
+                    video_id,
+                    ydl_opts,
+                    chosen_lang,
+                    temp_dir,
+                )
 
-                        return {
-                            "video_id": video_id,
-                            "video_title": info.get("title", "Unknown"),
-                            "captions": cleaned_text,
-                            "language_used": chosen_lang,
-                            "available_languages": list(all_captions.keys()),
-                            "caption_type": (
-                                "automatic" if chosen_lang in automatic_captions else "manual"
-                            ),
-                        }
-                    return {
+                if cleaned_text is not None:
+                    return project_fields(
+                        {**caption_info, "captions": cleaned_text},
+                        selected,
+                    )
+                return project_fields(
+                    {
                         "video_id": video_id,
                         "video_title": info.get("title", "Unknown"),
                         "captions": None,
                         "available_languages": list(all_captions.keys()),
                         "message": f"Failed to download captions for language {chosen_lang}",
-                    }
+                    },
+                    selected,
+                )
 
+            except TimeoutError as e:
+                return {
+                    "video_id": video_id,
+                    "error": str(e),
+                    "error_type": "timeout",
+                    "message": "Timed out extracting captions",
+                }
             except Exception as e:
                 return {
                     "video_id": video_id,
                     "error": str(e),
+                    "error_type": "network" if is_transient_error(e) else "extraction",
                     "message": "Failed to extract captions",
                 }
 
-    def get_video_topics(self, video_url: str) -> dict[str, Any]:
+    def _extract_caption_info(self, video_id: str, ydl_opts: dict[str, Any]) -> dict[str, Any]:
+        """Fetch video metadata including available subtitle languages."""
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+
+    def _download_caption_text(
+        self,
+        video_id: str,
+        ydl_opts: dict[str, Any],
+        chosen_lang: str,
+        temp_dir: str,
+    ) -> str | None:
+        """Download subtitles for one language and return the cleaned text."""
+        # Each attempt gets its own directory so hedged downloads never share files
+        attempt_dir = tempfile.mkdtemp(dir=temp_dir)
+
+        # Configure for specific language and download subtitles
+        ydl_opts_download = {
+            **ydl_opts,
+            "subtitleslangs": [chosen_lang],
+            "outtmpl": os.path.join(attempt_dir, "%(title)s.%(ext)s"),
+        }
+
+        with yt_dlp.YoutubeDL(ydl_opts_download) as ydl_download:
+            ydl_download.download([f"https://www.youtube.com/watch?v={video_id}"])
+
+        # Find and read the subtitle file
+        subtitle_files = glob.glob(os.path.join(attempt_dir, f"*.{chosen_lang}.srt"))
+        if not subtitle_files:
+            # Try without country code
+            lang_base = chosen_lang.split("-")[0]
+            subtitle_files = glob.glob(os.path.join(attempt_dir, f"*.{lang_base}.srt"))
+
+        if not subtitle_files:
+            return None
+
+        with open(subtitle_files[0], encoding="utf-8") as f:
+            return clean_caption_text(f.read())
+
+    def get_video_topics(
+        self,
+        video_url: str,
+        *,
+        fields: list[str] | None = None,
+        compact: bool = False,
+    ) -> dict[str, Any]:
         """Extract topics and sections from video description."""
         video_id = extract_video_id(video_url)
         if not video_id:
             raise ValueError(f"Invalid YouTube URL: {video_url}")
 
+        selected = resolve_fields(fields, TOPIC_FIELDS, COMPACT_TOPIC_FIELDS, compact=compact)
+        properties = {
+            _TOPIC_SNIPPET_PROPERTIES[field]
+            for field in selected
+            if field in _TOPIC_SNIPPET_PROPERTIES
+        }
+
         try:
-            # Get video details from YouTube API
-            request = self.youtube.videos().list(part="snippet,contentDetails", id=video_id)
+            # Get video details from YouTube API, fetching only the snippet properties we use
+            request = self.youtube.videos().list(
+                part="snippet",
+                id=video_id,
+                fields=_snippet_fields(properties),
+            )
 
             response = request.execute()
 
-            if not response["items"]:
+            if not response.get("items"):
                 return {
                     "video_id": video_id,
                     "error": "Video not found or is private",
@@ -151,34 +331,60 @@ class YouTubeClient:
                 }
 
             video_info = response["items"][0]
-            snippet = video_info["snippet"]
+            snippet = video_info.get("snippet", {})
             description = snippet.get("description", "")
 
             # Extract topics from description
-            topics = self._extract_topics_from_description(description)
+            topics = (
+                self._extract_topics_from_description(description) if "topics" in selected else []
+            )
 
-            return {
-                "video_id": video_id,
-                "video_title": snippet.get("title", "Unknown"),
-                "channel_title": snippet.get("channelTitle", "Unknown"),
-                "description": description,
-                "topics": topics,
-                "tags": snippet.get("tags", []),
-                "category_id": snippet.get("categoryId"),
-                "published_at": snippet.get("publishedAt"),
-            }
+            return project_fields(
+                {
+                    "video_id": video_id,
+                    "video_title": snippet.get("title", "Unknown"),
+                    "channel_title": snippet.get("channelTitle", "Unknown"),
+                    "description": description,
+                    "topics": topics,
+                    "tags": snippet.get("tags", []),
+                    "category_id": snippet.get("categoryId"),
+                    "published_at": snippet.get("publishedAt"),
+                },
+                selected,
+            )
 
         except HttpError as e:
             return {"video_id": video_id, "error": f"YouTube API error: {e!s}", "topics": []}
         except Exception as e:
             return {"video_id": video_id, "error": str(e), "topics": []}
 
-    def get_playlist_titles(self, playlist_url: str) -> dict[str, Any]:
-        """Extract video titles from YouTube playlist."""
+    def get_playlist_titles(
+        self,
+        playlist_url: str,
+        *,
+        fields: list[str] | None = None,
+        compact: bool = False,
+    ) -> dict[str, Any]:
+        """Extract video titles from YouTube playlist.
+
+        ``fields`` selects per-video fields. In compact mode each video is a row
+        ordered by the returned ``video_fields`` header instead of a dict.
+        """
         playlist_id = extract_playlist_id(playlist_url)
         if not playlist_id:
             raise ValueError(f"Invalid YouTube playlist URL: {playlist_url}")
 
+        selected = resolve_fields(
+            fields,
+            PLAYLIST_VIDEO_FIELDS,
+            COMPACT_PLAYLIST_VIDEO_FIELDS,
+            compact=compact,
+        )
+        item_fields = _snippet_fields(
+            {_PLAYLIST_VIDEO_SNIPPET_PROPERTIES[field] for field in selected},
+            prefix="nextPageToken,",
+        )
+
         try:
             videos = []
             next_page_token = None
@@ -189,46 +395,63 @@ class YouTubeClient:
                     playlistId=playlist_id,
                     maxResults=50,
                     pageToken=next_page_token,
+                    fields=item_fields,
                 )
 
                 response = request.execute()
 
-                for item in response["items"]:
-                    snippet = item["snippet"]
+                for item in response.get("items", []):
+                    snippet = item.get("snippet", {})
                     video_info = {
-                        "video_id": snippet["resourceId"]["videoId"],
-                        "title": snippet["title"],
-                        "channel_title": snippet["channelTitle"],
-                        "published_at": snippet["publishedAt"],
-                        "position": snippet["position"],
+                        "video_id": snippet.get("resourceId", {}).get("videoId"),
+                        "title": snippet.get("title"),
+                        "channel_title": snippet.get("channelTitle"),
+                        "published_at": snippet.get("publishedAt"),
+                        "position": snippet.get("position"),
                     }
-                    videos.append(video_info)
+                    if compact:
+                        videos.append([video_info[field] for field in selected])
+                    else:
+                        videos.append(project_fields(video_info, selected))
 
                 next_page_token = response.get("nextPageToken")
                 if not next_page_token:
                     break
 
             # Get playlist metadata
-            playlist_request = self.youtube.playlists().list(part="snippet", id=playlist_id)
+            playlist_properties = (
+                {"title"} if compact else {"title", "description", "channelTitle", "publishedAt"}
+            )
+            playlist_request = self.youtube.playlists().list(
+                part="snippet",
+                id=playlist_id,
+                fields=_snippet_fields(playlist_properties),
+            )
 
             playlist_response = playlist_request.execute()
             playlist_info = {}
 
-            if playlist_response["items"]:
+            if playlist_response.get("items"):
                 playlist_snippet = playlist_response["items"][0]["snippet"]
-                playlist_info = {
-                    "title": playlist_snippet.get("title", "Unknown"),
-                    "description": playlist_snippet.get("description", ""),
-                    "channel_title": playlist_snippet.get("channelTitle", "Unknown"),
-                    "published_at": playlist_snippet.get("publishedAt"),
-                }
+                playlist_info = {"title": playlist_snippet.get("title", "Unknown")}
+                if not compact:
+                    playlist_info.update(
+                        {
+                            "description": playlist_snippet.get("description", ""),
+                            "channel_title": playlist_snippet.get("channelTitle", "Unknown"),
+                            "published_at": playlist_snippet.get("publishedAt"),
+                        },
+                    )
 
-            return {
+            result = {
                 "playlist_id": playlist_id,
                 "playlist_info": playlist_info,
                 "videos": videos,
                 "total_videos": len(videos),
             }
+            if compact:
+                result["video_fields"] = list(selected)
+            return result
 
         except HttpError as e:
             return {
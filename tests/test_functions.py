@@ -1,14 +1,28 @@
 """Test script for YouTube MCP functions."""
 
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
 
 from dotenv import load_dotenv
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from youtube_mcp.utils import extract_playlist_id, extract_video_id, is_valid_youtube_url
+from youtube_mcp.export import ShardWriter, export_captions
+from youtube_mcp.prefetch import CaptionPrefetcher
+from youtube_mcp.resilience import LatencyTracker, PhaseRunner, PhaseTimeoutError
+from youtube_mcp.utils import (
+    extract_playlist_id,
+    extract_video_id,
+    is_valid_youtube_url,
+    project_fields,
+    resolve_fields,
+)
 from youtube_mcp.youtube_client import YouTubeClient
 
 # Load environment variables
@@ -60,6 +74,346 @@ def test_utility_functions():
         is_valid = is_valid_youtube_url(url)
         print(f"  {url}: {is_valid}")
 
+    # Test field selection
+    available = ("video_id", "title", "position")
+    selected = resolve_fields(["position", "video_id"], available, ("video_id",))
+    print(f"\nSelected fields: {selected}")
+    assert selected == ("video_id", "position")
+    assert resolve_fields(None, available, ("video_id",), compact=True) == ("video_id",)
+    assert resolve_fields(None, available, ("video_id",)) == available
+
+    projected = project_fields({"video_id": "x", "title": "t", "error": "e"}, ("video_id",))
+    print(f"Projected: {projected}")
+    assert projected == {"video_id": "x", "error": "e"}
+
+
+def test_field_selection_requests():
+    """Test that field selection reaches the Data API and yt-dlp with a mocked backend."""
+    print("\n=== Testing Field Selection Requests ===")
+
+    video_url = "https://www.youtube.com/watch?v=v1"
+    playlist_url = "https://www.youtube.com/playlist?list=PL123"
+
+    with patch("youtube_mcp.youtube_client.build") as build:
+        youtube = build.return_value
+        videos_list = youtube.videos.return_value.list
+        videos_list.return_value.execute.return_value = {
+            "items": [{"snippet": {"title": "t", "description": "0:00 - Introduction"}}],
+        }
+        items_list = youtube.playlistItems.return_value.list
+        items_list.return_value.execute.return_value = {
+            "items": [{"snippet": {"resourceId": {"videoId": "v1"}, "title": "t", "position": 0}}],
+        }
+        playlists_list = youtube.playlists.return_value.list
+        playlists_list.return_value.execute.return_value = {
+            "items": [{"snippet": {"title": "Playlist"}}],
+        }
+
+        client = YouTubeClient("test-key")
+
+        # Only the snippet properties backing the requested fields are fetched
+        assert client.get_video_topics(video_url, fields=["video_id"]) == {"video_id": "v1"}
+        assert videos_list.call_args.kwargs["fields"] == "items(id)"
+
+        topics = client.get_video_topics(video_url, compact=True)
+        print(f"Compact topics: {topics}")
+        assert videos_list.call_args.kwargs["fields"] == "items(snippet(description,title))"
+        assert set(topics) == {"video_id", "video_title", "topics"}
+
+        # Compact playlists return rows under a video_fields header
+        playlist = client.get_playlist_titles(playlist_url, compact=True)
+        print(f"Compact playlist: {playlist}")
+        assert items_list.call_args.kwargs["fields"] == (
+            "nextPageToken,items(snippet(position,resourceId/videoId,title))"
+        )
+        assert playlists_list.call_args.kwargs["fields"] == "items(snippet(title))"
+        assert playlist["video_fields"] == ["video_id", "title", "position"]
+        assert playlist["videos"] == [["v1", "t", 0]]
+        assert playlist["playlist_info"] == {"title": "Playlist"}
+
+    downloads = []
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        def extract_info(self, url, download):
+            return {"title": "t", "subtitles": {"en": [{}]}, "automatic_captions": {}}
+
+        def download(self, urls):
+            downloads.append(urls)
+
+    # Subtitles are not downloaded unless the captions text is requested
+    with (
+        patch("youtube_mcp.youtube_client.build"),
+        patch("youtube_mcp.youtube_client.yt_dlp.YoutubeDL", FakeYoutubeDL),
+    ):
+        client = YouTubeClient("test-key")
+        result = client.get_video_captions(video_url, "en", fields=["video_id", "language_used"])
+        print(f"Captions without text: {result}")
+        assert result == {"video_id": "v1", "language_used": "en"}
+        assert downloads == []
+
+
+def test_caption_prefetcher():
+    """Test caption prefetch scheduling and claiming."""
+    print("\n=== Testing Caption Prefetcher ===")
+
+    fetched = []
+
+    def fake_fetch(video_url, language):
+        fetched.append(video_url)
+        return {"video_id": video_url.rsplit("=", 1)[-1], "captions": "hello", "language": language}
+
+    prefetcher = CaptionPrefetcher(fake_fetch, top_n=2, max_concurrency=1, budget=5)
+    try:
+        scheduled = prefetcher.schedule(["a", "b", "c"])
+        print(f"Scheduled: {scheduled}")
+        assert scheduled == ["a", "b"]
+        time.sleep(0.05)
+
+        result = prefetcher.take("a", "en")
+        print(f"Claimed 'a': {result}")
+        assert result is not None
+        assert result["captions"] == "hello"
+
+        # Each prefetch is served once, other languages and unlisted videos miss
+        assert prefetcher.take("a", "en") is None
+        assert prefetcher.take("b", "es") is None
+        assert prefetcher.take("c", "en") is None
+    finally:
+        prefetcher.shutdown()
+
+    # A stalled prefetch is waited on for at most its TTL
+    stalled = CaptionPrefetcher(lambda *_: time.sleep(1) or {}, top_n=1, ttl_seconds=0.2)
+    try:
+        stalled.schedule(["a"])
+        time.sleep(0.05)
+        start = time.monotonic()
+        assert stalled.take("a", "en") is None
+        print(f"Stalled prefetch abandoned after {time.monotonic() - start:.2f}s")
+        assert time.monotonic() - start < 0.5
+    finally:
+        stalled.shutdown()
+
+    # Workers are daemon threads so a stuck prefetch cannot block interpreter exit
+    assert all(worker.daemon for worker in stalled._workers)
+
+
+def test_shard_writer():
+    """Test export shard rotation and checkpoint resume."""
+    print("\n=== Testing Export Shard Writer ===")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        writer = ShardWriter(output_dir, shard_size=2)
+        for video_id in ("a", "b", "c"):
+            writer.write({"video_id": video_id, "captions": "hello"}, "en")
+        writer.flush()
+
+        shards = sorted(name for name in os.listdir(output_dir) if name.startswith("part-"))
+        print(f"Shards: {shards}")
+        assert shards == ["part-00000.jsonl", "part-00001.jsonl"]
+
+        with open(os.path.join(output_dir, shards[0]), encoding="utf-8") as f:
+            assert [json.loads(line)["video_id"] for line in f] == ["a", "b"]
+
+        # A new writer picks up the checkpoint and continues shard numbering
+        resumed = ShardWriter(output_dir, shard_size=2)
+        print(f"Resumed with completed: {sorted(resumed.completed)}")
+        assert resumed.completed == {("a", "en"), ("b", "en"), ("c", "en")}
+        resumed.write({"video_id": "d", "captions": "hello"}, "en")
+        resumed.flush()
+        assert os.path.exists(os.path.join(output_dir, "part-00002.jsonl"))
+
+        # Checkpoint entries whose shard was never renamed into place are ignored
+        os.remove(os.path.join(output_dir, "part-00002.jsonl"))
+        crashed = ShardWriter(output_dir, shard_size=2)
+        assert ("d", "en") not in crashed.completed
+        crashed.write({"video_id": "d", "captions": "hello"}, "en")
+        crashed.flush()
+        assert os.path.exists(os.path.join(output_dir, "part-00003.jsonl"))
+
+    # A crash mid-shard keeps every checkpointed record
+    with tempfile.TemporaryDirectory() as output_dir:
+        writer = ShardWriter(output_dir, shard_size=10)
+        for video_id in ("a", "b", "c"):
+            writer.write({"video_id": video_id, "captions": "hello"}, "en")
+        # Simulate dying mid-way: a record written without its checkpoint line, then a torn one
+        writer._file.write(json.dumps({"video_id": "x", "captions": "hello"}) + "\n")
+        writer._file.write('{"video_id": "y", "capt')
+        writer._file.close()
+        writer._checkpoint.close()
+
+        resumed = ShardWriter(output_dir, shard_size=10)
+        print(f"Recovered after crash: {sorted(resumed.completed)}")
+        assert resumed.completed == {("a", "en"), ("b", "en"), ("c", "en")}
+        assert sorted(os.listdir(output_dir)) == ["checkpoint.txt", "part-00000.jsonl"]
+        with open(os.path.join(output_dir, "part-00000.jsonl"), encoding="utf-8") as f:
+            assert [json.loads(line)["video_id"] for line in f] == ["a", "b", "c"]
+
+
+def test_export_captions():
+    """Test bulk export skipping completed videos and counting failures."""
+    print("\n=== Testing Caption Export ===")
+
+    class FakeClient:
+        def __init__(self):
+            self.fetched = []
+
+        def get_playlist_titles(self, playlist_url, **kwargs):
+            return {"videos": [["p1"], ["p2"], ["v1"]], "video_fields": ["video_id"]}
+
+        def get_video_captions(self, video_url, language):
+            video_id = extract_video_id(video_url)
+            self.fetched.append((video_id, language))
+            if video_id == "bad":
+                return {"video_id": video_id, "error": "unavailable"}
+            if video_id == "nodl":
+                return {"video_id": video_id, "captions": None, "available_languages": ["en"]}
+            if video_id == "none":
+                return {"video_id": video_id, "captions": None, "available_languages": []}
+            return {"video_id": video_id, "captions": "hello", "language_used": language}
+
+    urls = [
+        "https://www.youtube.com/watch?v=v1",
+        "https://www.youtube.com/playlist?list=PL123",
+        "https://www.youtube.com/watch?v=bad",
+        "https://www.youtube.com/watch?v=nodl",
+        "https://www.youtube.com/watch?v=none",
+        "not-a-url",
+    ]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        client = FakeClient()
+        writer = ShardWriter(output_dir, shard_size=2)
+        exported, failed = export_captions(client, urls, writer, language="en", workers=2)
+        print(f"Exported: {exported}, failed: {failed}")
+        # A video without captions is exported; a failed subtitle download is not
+        assert (exported, failed) == (4, 2)
+        assert len(client.fetched) == 6
+
+        # Rerunning only retries the failed videos
+        client = FakeClient()
+        writer = ShardWriter(output_dir, shard_size=2)
+        assert export_captions(client, urls, writer, language="en", workers=2) == (0, 2)
+        assert sorted(client.fetched) == [("bad", "en"), ("nodl", "en")]
+
+        # A different language is exported separately
+        client = FakeClient()
+        writer = ShardWriter(output_dir, shard_size=2)
+        assert export_captions(client, urls, writer, language="es", workers=2) == (4, 2)
+
+    # URLs are consumed lazily, never running ahead of the in-flight window
+    consumed = []
+    max_ahead = []
+
+    def lazy_urls():
+        for i in range(20):
+            consumed.append(i)
+            yield f"https://www.youtube.com/watch?v=vid{i}"
+
+    class SlowClient(FakeClient):
+        def get_video_captions(self, video_url, language):
+            time.sleep(0.01)
+            result = super().get_video_captions(video_url, language)
+            max_ahead.append(len(consumed) - len(self.fetched))
+            return result
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        writer = ShardWriter(output_dir, shard_size=5)
+        assert export_captions(SlowClient(), lazy_urls(), writer, workers=1) == (20, 0)
+        print(f"Max URLs consumed ahead of completed fetches: {max(max_ahead)}")
+        assert max(max_ahead) <= 3
+
+
+def test_phase_runner():
+    """Test phase deadlines, transient retries and hedging."""
+    print("\n=== Testing Phase Runner ===")
+
+    # Deadline covers all attempts and is not retried
+    stalls = []
+
+    def stall():
+        stalls.append(1)
+        time.sleep(0.5)
+
+    runner = PhaseRunner("sleep", timeout=0.2, max_retries=2, backoff=0.01)
+    start = time.monotonic()
+    try:
+        runner.run(stall)
+        raise AssertionError("Expected timeout")
+    except PhaseTimeoutError as e:
+        elapsed = time.monotonic() - start
+        print(f"✓ Deadline enforced after {elapsed:.2f}s: {e}")
+        assert elapsed < 0.35
+        assert len(stalls) == 1
+
+    # Stalled attempts do not delay later calls or count against their deadlines
+    runner = PhaseRunner("shared", timeout=0.1, max_retries=0)
+    for _ in range(8):
+        try:
+            runner.run(time.sleep, 1)
+        except PhaseTimeoutError:
+            pass
+    assert runner.run(lambda: "ok") == "ok"
+
+    results = []
+    runner = PhaseRunner("concurrent", timeout=0.5, max_retries=0)
+    callers = [
+        threading.Thread(target=lambda: results.append(runner.run(time.sleep, 0.3)))
+        for _ in range(16)
+    ]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    print(f"✓ Concurrent callers completed: {len(results)}/16")
+    assert len(results) == 16
+
+    # Backoff never extends past the deadline
+    def refused():
+        raise ConnectionError("connection refused")
+
+    start = time.monotonic()
+    try:
+        PhaseRunner("refused", timeout=0.2, max_retries=5, backoff=0.5).run(refused)
+        raise AssertionError("Expected connection error")
+    except ConnectionError:
+        assert time.monotonic() - start < 0.2
+
+    # Transient errors are retried, others are not
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise ConnectionError("connection reset")
+        return "ok"
+
+    assert PhaseRunner("flaky", max_retries=2, backoff=0.01).run(flaky) == "ok"
+    print(f"✓ Retried transient error, attempts: {len(attempts)}")
+
+    # Hedged attempt wins when the first exceeds observed p95
+    tracker = LatencyTracker(min_samples=3)
+    for _ in range(5):
+        tracker.record(0.05)
+    calls = []
+
+    def slow_first():
+        calls.append(1)
+        time.sleep(0.5 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    result = PhaseRunner("hedged", timeout=2, hedge=True, tracker=tracker).run(slow_first)
+    print(f"✓ Hedged result from attempt: {result}")
+    assert result == 2
+
 
 def test_youtube_client():
     """Test YouTube client functions."""
@@ -164,6 +518,11 @@ def main():
     print("=" * 50)
 
     test_utility_functions()
+    test_field_selection_requests()
+    test_caption_prefetcher()
+    test_shard_writer()
+    test_export_captions()
+    test_phase_runner()
     test_youtube_client()
 
     print("\n" + "=" * 50)